@@ -0,0 +1,274 @@
+import os
+import json
+import shutil
+
+import numpy as np
+
+from meta import Model
+
+# Out-of-core exact model: every (context, symbol) pair is encoded as a 2-bit-per-base
+# integer key, sorted runs of keys are spilled to disk under a memory budget and then
+# merged into one sorted key array plus a cumulative count array. Scoring looks both up
+# through mmap, so the model size is bounded by disk rather than RAM.
+
+CODES = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(b"ACGT"):
+    CODES[_base] = _code
+
+# bytes of working memory per symbol of a counting block (uint64 key, sort mask, run indices,
+# unique keys and counts) and per entry of a merge range (keys, counts, argsort order, the
+# reordered copy, then run starts and the reduced output), measured against peak RSS
+BYTES_PER_SYMBOL = 40
+BYTES_PER_ENTRY = 48
+READ_SIZE = 1 << 24
+
+def encode(text: bytes)-> np.ndarray:
+    codes = CODES[np.frombuffer(text, dtype=np.uint8)]
+    return codes[codes != 255]
+
+def window_keys(codes: np.ndarray, ko: int)-> np.ndarray:
+    # key of position i is context codes[i:i+ko] followed by the symbol codes[i+ko]
+    n = len(codes) - ko
+    keys = np.zeros(max(n, 0), dtype=np.uint64)
+    for j in range(ko + 1):
+        keys <<= np.uint64(2)
+        # the ufunc widens the uint8 codes in small buffers instead of a full uint64 copy
+        np.bitwise_or(keys, codes[j:j+n], out=keys)
+    return keys
+
+def iter_reference(file_path: str, block: int, ko: int):
+    # yields encoded blocks of exactly `block` new symbols (the last may be shorter), each
+    # repeating the previous ko symbols; reads are capped at block bytes so the buffer is too
+    tail = np.zeros(0, dtype=np.uint8)
+    buffered = []
+    size = 0
+    with open(file_path, "rb") as f:
+        while data := f.read(min(READ_SIZE, block)):
+            buffered.append(encode(data))
+            size += len(buffered[-1])
+            if size >= block:
+                codes = np.concatenate([tail] + buffered)
+                rest = codes[len(tail) + block:].copy()
+                codes = codes[:len(tail) + block]
+                yield codes
+                tail = codes[len(codes) - ko:].copy()
+                buffered, size = [rest], len(rest)
+    if size:
+        yield np.concatenate([tail] + buffered)
+
+def run_starts(keys: np.ndarray)-> np.ndarray:
+    # index of the first occurrence of every distinct value of sorted keys
+    first = np.empty(len(keys), dtype=bool)
+    first[:1] = True
+    np.not_equal(keys[1:], keys[:-1], out=first[1:])
+    return np.flatnonzero(first)
+
+def write_run(directory: str, index: int, keys: np.ndarray):
+    # sorts keys in place and spills the distinct ones with their counts
+    keys.sort()
+    starts = run_starts(keys)
+    keys[starts].tofile(os.path.join(directory, f"keys_{index}.bin"))
+    counts = np.empty(len(starts), dtype=np.int64)
+    np.subtract(starts[1:], starts[:-1], out=counts[:-1])
+    counts[-1:] = len(keys) - starts[-1:]
+    counts.view(np.uint64).tofile(os.path.join(directory, f"counts_{index}.bin"))
+
+def read_range(f, start: int, end: int, out: np.ndarray):
+    # reads uint64 entries [start, end) of an open file into out, without mapping the file
+    f.seek(start * 8)
+    f.readinto(memoryview(out[:end - start]).cast("B"))
+
+def sample_run(f, length: int, stride: int)-> tuple[np.ndarray,np.ndarray]:
+    # (positions, keys) of every stride-th entry of an open run, read one by one
+    positions = np.arange(0, length, stride)
+    keys = np.array([np.frombuffer(os.pread(f.fileno(), 8, int(p) * 8), dtype=np.uint64)[0] for p in positions], dtype=np.uint64)
+    return positions, keys
+
+def find_bound(f, length: int, positions: np.ndarray, samples: np.ndarray, bound: int)-> int:
+    # first index of an open run whose key is >= bound, reading only the stretch between two samples
+    j = int(np.searchsorted(samples, np.uint64(bound)))
+    if j == 0:
+        return 0
+    lo = int(positions[j - 1])
+    hi = int(positions[j]) if j < len(positions) else length
+    stretch = np.empty(hi - lo, dtype=np.uint64)
+    read_range(f, lo, hi, stretch)
+    return lo + int(np.searchsorted(stretch, np.uint64(bound)))
+
+def merge_runs(run_dir: str, runs: int, directory: str, memory_mb: int):
+    # runs are read through plain file reads; mapped pages would stay resident and exceed the budget
+    keys_files = [open(os.path.join(run_dir, f"keys_{i}.bin"), "rb") for i in range(runs)]
+    counts_files = [open(os.path.join(run_dir, f"counts_{i}.bin"), "rb") for i in range(runs)]
+    lengths = [os.fstat(f.fileno()).st_size // 8 for f in keys_files]
+    entries = sum(lengths)
+    indexes = [sample_run(f, length, max(1, length // 1024)) for f, length in zip(keys_files, lengths)]
+
+    # split the key space into ranges small enough to merge in memory, using sampled keys as bounds
+    ranges = max(1, -(-entries * BYTES_PER_ENTRY // (memory_mb << 20)))
+    samples = np.sort(np.concatenate([keys for _, keys in indexes]))
+    bounds = [samples[len(samples) * r // ranges] for r in range(1, ranges)] if ranges > 1 else []
+    bounds = sorted(set(int(b) for b in bounds)) + [None]
+
+    keys_out = open(os.path.join(directory, "keys.bin"), "wb")
+    counts_out = open(os.path.join(directory, "counts.bin"), "wb")
+    written = 0
+    # ranges come in key order, so every run is consumed from where the previous range ended
+    cursors = [0] * runs
+    for hi in bounds:
+        spans = []
+        for i, (f, length, (positions, keys)) in enumerate(zip(keys_files, lengths, indexes)):
+            end = length if hi is None else find_bound(f, length, positions, keys, hi)
+            spans.append((cursors[i], end))
+            cursors[i] = end
+        size = sum(end - start for start, end in spans)
+        keys = np.empty(size, dtype=np.uint64)
+        counts = np.empty(size, dtype=np.uint64)
+        offset = 0
+        for (start, end), keys_file, counts_file in zip(spans, keys_files, counts_files):
+            read_range(keys_file, start, end, keys[offset:])
+            read_range(counts_file, start, end, counts[offset:])
+            offset += end - start
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        counts = counts[order]
+        del order
+        starts = run_starts(keys)
+        keys[starts].tofile(keys_out)
+        (np.add.reduceat(counts, starts) if len(keys) else counts).tofile(counts_out)
+        written += len(starts)
+        del keys, counts, starts
+    for f in keys_files + counts_files + [keys_out, counts_out]:
+        f.close()
+    return written
+
+def write_npy_header(f, length: int):
+    np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(np.dtype(np.uint64)),
+                                             "fortran_order": False, "shape": (length,)})
+
+def source_info(file_path: str, ko: int)-> dict:
+    # what a built directory depends on; any difference means it has to be rebuilt
+    stat = os.stat(file_path)
+    return {"source": os.path.abspath(file_path), "size": stat.st_size, "mtime": stat.st_mtime_ns, "ko": ko}
+
+def is_current(directory: str, file_path: str, ko: int)-> bool:
+    try:
+        with open(os.path.join(directory, "model.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return all(meta.get(key) == value for key, value in source_info(file_path, ko).items())
+
+def build_disk_model(file_path: str, ko: int, directory: str, memory_mb: int = 1024)-> str:
+    # counts the reference in file_path into directory without holding the table in RAM
+    # two spare bits keep the context range bound (first + 4) from overflowing
+    if 2 * (ko + 1) > 62:
+        raise ValueError(f"depth {ko} does not fit in a 64-bit key")
+    os.makedirs(directory, exist_ok=True)
+    # an interrupted rebuild must not leave the old description next to partial arrays
+    if os.path.exists(os.path.join(directory, "model.json")):
+        os.remove(os.path.join(directory, "model.json"))
+    run_dir = os.path.join(directory, "runs")
+    os.makedirs(run_dir, exist_ok=True)
+
+    block = max(1 << 16, (memory_mb << 20) // BYTES_PER_SYMBOL)
+    symbols = np.zeros(4, dtype=np.int64)
+    runs = 0
+    for codes in iter_reference(file_path, block, ko):
+        symbols += np.bincount(codes[ko if runs else 0:], minlength=4)
+        keys = window_keys(codes, ko)
+        if len(keys):
+            write_run(run_dir, runs, keys)
+            runs += 1
+        del keys
+
+    entries = merge_runs(run_dir, runs, directory, memory_mb)
+    shutil.rmtree(run_dir)
+
+    # counts.bin becomes its running sum, so a count and a context total are each two lookups;
+    # both final arrays are streamed rather than mapped whole, in pieces of a quarter of the
+    # budget since the previous piece is still alive while the next one is read
+    step = max(1, (memory_mb << 20) // 32)
+    with open(os.path.join(directory, "counts.bin"), "rb") as src, open(os.path.join(directory, "cumulative.npy"), "wb") as out:
+        write_npy_header(out, entries + 1)
+        np.zeros(1, dtype=np.uint64).tofile(out)
+        carry = np.uint64(0)
+        while len(part := np.fromfile(src, dtype=np.uint64, count=step)):
+            np.cumsum(part, out=part)
+            part += carry
+            carry = part[-1]
+            part.tofile(out)
+    os.remove(os.path.join(directory, "counts.bin"))
+
+    with open(os.path.join(directory, "keys.bin"), "rb") as src, open(os.path.join(directory, "keys.npy"), "wb") as out:
+        write_npy_header(out, entries)
+        shutil.copyfileobj(src, out, step * 8)
+    os.remove(os.path.join(directory, "keys.bin"))
+
+    # model.json is written last and atomically: a directory with one always has complete arrays
+    meta = source_info(file_path, ko)
+    meta.update({"alphabet": ["ACGT"[i] for i in range(4) if symbols[i]], "entries": entries})
+    temporary = os.path.join(directory, "model.json.tmp")
+    with open(temporary, "w") as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, os.path.join(directory, "model.json"))
+    return directory
+
+class DiskModel(Model):
+    # same scoring as Model, with the table looked up in the mmapped files of build_disk_model
+    def __init__(self, directory: str, alpha: float, block: int = 1 << 20):
+        with open(os.path.join(directory, "model.json"), "r") as f:
+            meta = json.load(f)
+        self.ko = meta["ko"]
+        self.alpha = alpha
+        self.alphabet = set(meta["alphabet"])
+        self.inverted_repeats = False
+        self.dense = None
+        # read-only: never updated, so ScoreCache sees no changes
+        self.tail = ""
+        self.version = 0
+        self.changes = []
+        self.block = block
+        self.keys = np.load(os.path.join(directory, "keys.npy"), mmap_mode="r")
+        self.cumulative = np.load(os.path.join(directory, "cumulative.npy"), mmap_mode="r")
+
+    def lookup(self, keys: np.ndarray)-> tuple[np.ndarray,np.ndarray]:
+        # (count of each key, total of its context)
+        index = np.searchsorted(self.keys, keys)
+        found = index < len(self.keys)
+        found[found] = self.keys[index[found]] == keys[found]
+        counts = np.where(found, self.cumulative[np.minimum(index + 1, len(self.keys))] - self.cumulative[index], 0)
+        first = keys & ~np.uint64(3)
+        lo = np.searchsorted(self.keys, first)
+        hi = np.searchsorted(self.keys, first + np.uint64(4))
+        totals = self.cumulative[hi] - self.cumulative[lo]
+        return counts.astype(np.float64), totals.astype(np.float64)
+
+    def symbol_bits(self, text: str)-> list[float]:
+        return self.bits_array(text).tolist()
+
+    def bits_array(self, text: str)-> np.ndarray:
+        const_term = self.alpha * len(self.alphabet)
+        codes = encode(text.encode("ascii"))
+        parts = []
+        for start in range(0, max(len(codes) - self.ko, 0), self.block):
+            keys = window_keys(codes[start:start + self.block + self.ko], self.ko)
+            counts, totals = self.lookup(keys)
+            parts.append(-np.log2((counts + self.alpha) / (totals + const_term)))
+        return np.concatenate(parts) if parts else np.zeros(0)
+
+    def estimate_bits(self, text: str)-> float:
+        return float(self.bits_array(text).sum())
+
+    def releases_gil(self)-> bool:
+        return True
+
+    def build_table(self, text: str, workers: int = 1):
+        raise TypeError("DiskModel is read-only; build its table with build_disk_model")
+
+    def update(self, text: str):
+        raise TypeError("DiskModel is read-only; rebuild it with build_disk_model")
+
+    def merge(self, other: Model):
+        raise TypeError("DiskModel is read-only; rebuild it with build_disk_model")
@@ -0,0 +1,101 @@
+import argparse
+from math import log2
+
+import numpy as np
+from tqdm import tqdm
+
+import concurrent.futures
+
+from meta import parse_database, open_file, Model, print_log
+
+def window_nrcs(bits: np.ndarray, window: int, alphabet_size: int)-> np.ndarray:
+    # prefix[j] - prefix[i] is the information of bits[i:j], so every window costs O(1)
+    prefix = np.zeros(len(bits) + 1, dtype=np.float64)
+    np.cumsum(bits, out=prefix[1:])
+    return (prefix[window:] - prefix[:-window]) / (window * log2(alphabet_size))
+
+def top_segments(nrcs: np.ndarray, window: int, top: int)-> list[tuple[int,float]]:
+    # greedily keep the best windows that do not overlap an already chosen one
+    taken = np.zeros(len(nrcs) + window, dtype=bool)
+    ret = []
+    for start in np.argsort(nrcs, kind="stable"):
+        if len(ret) >= top:
+            break
+        if taken[start] or taken[start + window - 1]:
+            continue
+        taken[start:start + window] = True
+        ret.append((int(start), float(nrcs[start])))
+    return ret
+
+def scan_sequence(model: Model, name: str, sequence: str, windows: list[int], top: int)-> list[tuple[str,int,int,int,float]]:
+    bits = np.asarray(model.symbol_bits(sequence), dtype=np.float64)
+    alphabet_size = max(2, len(set(sequence)))
+    ret = []
+    for window in windows:
+        if window > len(bits):
+            continue
+        nrcs = window_nrcs(bits, window, alphabet_size)
+        for start, nrc in top_segments(nrcs, window, top):
+            # bits[i] belongs to sequence[i+ko], so shift back to sequence coordinates
+            begin = start + model.ko
+            ret.append((name, window, begin, begin + window, nrc))
+    return ret
+
+def print_segments(segments, top, csv = False):
+    if csv:
+        for name, window, begin, end, nrc in segments[:top]:
+            print(f"{nrc}\t{window}\t{begin}\t{end}\t{name}")
+        return
+
+    print(f"\n{'NRC':<8}{'Window':>8}{'Start':>12}{'End':>12}  Identifier")
+    for name, window, begin, end, nrc in segments[:top]:
+        print(f"{nrc:<8.4f}{window:>8}{begin:>12}{end:>12}  {name[:100]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="MetaClass: find locally similar segments.")
+    parser.add_argument("-d","--data", type=str, required=True, help="Database file")
+    parser.add_argument("-s","--sequence", type=str, required=True, help="Sequence to compare")
+    parser.add_argument("-k","--context", type=int, default=2 , help="Depth of the context")
+    parser.add_argument("-a","--alpha", type=float, default=1.0 , help="Smoothing factor")
+    parser.add_argument("-w","--windows", type=int, nargs="+", default=[1000], help="Window sizes in symbols")
+    parser.add_argument("-n","--segments", type=int, default=5 , help="Top segments kept per sequence and window")
+    parser.add_argument("-t","--top", type=int, default=20 , help="Top N similar segments")
+    parser.add_argument("-i","--inverted-repeats", action="store_true", help="Also count reverse-complement contexts")
+    parser.add_argument("-v","--verbose", action="store_true", help="Print verbose")
+    parser.add_argument("-c","--csv", action="store_true", help="Output in CSV format")
+
+    args = parser.parse_args()
+
+    database_text = open_file(args.data)
+    sequences = parse_database(database_text)
+    if args.verbose:
+        print_log(f"[INFO] Database: loaded {len(sequences)} sequences")
+
+    sequence_text = open_file(args.sequence)
+    sequence_text = "".join([c for c in sequence_text if c in "ACGT"])
+
+    model = Model(sequence_text, args.context, args.alpha, inverted_repeats=args.inverted_repeats)
+    if args.verbose:
+        print_log(f"[INFO] Model: created with depth {args.context} and alpha {args.alpha}")
+
+    progress_bar = tqdm(total=len(sequences), desc="Scanning windows", ncols=100)
+
+    segments = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [executor.submit(scan_sequence, model, name, seq, args.windows, args.segments) for name, seq in sequences]
+
+        for future in concurrent.futures.as_completed(futures):
+            segments.extend(future.result())
+            progress_bar.update(1)
+
+    progress_bar.close()
+    print("\033[F\033[K", end="")
+
+    segments.sort(key=lambda x: x[4])
+    if args.verbose:
+        print_log(f"[INFO] Similarity: found {len(segments)} segments for windows {args.windows}")
+
+    print_segments(segments, args.top, args.csv)
+
+if __name__ == "__main__":
+    main()
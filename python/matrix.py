@@ -1,9 +1,7 @@
 import argparse
 
-from meta import parse_database , open_file, Model , print_log
+from meta import load_database, build_model, score, Model , print_log
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.manifold import TSNE
 
 def build_matrix(sequences: list[tuple[str,str]], k: int, alpha: float)-> np.ndarray:
     matrix = np.zeros((len(sequences),len(sequences)),dtype=np.float32)
@@ -16,7 +14,10 @@ def build_matrix(sequences: list[tuple[str,str]], k: int, alpha: float)-> np.nda
     return matrix
 
 def visualize(nrc_matrix, labels_name=None, new_row=None, trim_indexes=None):
-    
+    # plotting and t-SNE are only loaded when a visualization is requested
+    import matplotlib.pyplot as plt
+    from sklearn.manifold import TSNE
+
     dist_matrix = nrc_matrix + nrc_matrix.T  # Make it symmetric
     dist_matrix /= 2  # Average the two halves
 
@@ -77,8 +78,7 @@ def main():
     
     args = parser.parse_args()
     
-    database_text = open_file(args.data)
-    sequences = parse_database(database_text)
+    sequences = load_database(args.data)
     if args.verbose:
         print_log(f"[INFO] Database: loaded {len(sequences)} sequences")
     
@@ -87,13 +87,8 @@ def main():
     else:
         matrix = build_matrix(sequences, args.context, args.alpha)
     
-    sequence_text = open_file(args.sequence)
-    sequence_text = "".join([c for c in sequence_text if c in "ACGT"])
-    
-    model = Model(sequence_text, args.context, args.alpha)
-    nrcs = np.zeros((1, len(sequences)), dtype=np.float32)
-    for i in range(len(sequences)):
-        nrcs[0][i] = model.nrc(sequences[i][1])
+    model = build_model(args.sequence, args.context, args.alpha)
+    nrcs = score(sequences, model).astype(np.float32).reshape(1, -1)
             
     if args.verbose:
         print_log(f"[INFO] Matrix: built {len(sequences)}x{len(sequences)} matrix")
@@ -1,7 +1,9 @@
 import argparse
-from math import log
+import sys
+import time
+import bisect
+from math import log, log2, inf
 from datetime import datetime
-from tqdm import tqdm
 
 import concurrent.futures
 
@@ -11,7 +13,7 @@ def open_file(file_path: str)-> str:
 
 def print_log(*args, **kwargs):
     now = datetime.now()
-    print(now.strftime("%H:%M:%S:%f"), end=" ")
+    print(now.strftime("%H:%M:%S:%f"), end=" ", file=kwargs.get("file"))
     print(*args, **kwargs)
 
 def parse_database(text: str)-> list[tuple[str,str]]:
@@ -24,28 +26,248 @@ def parse_database(text: str)-> list[tuple[str,str]]:
         ret.append((name,sequence))
     return ret
 
+def iter_database(file_path: str):
+    # streaming counterpart of parse_database, yields records as soon as they are complete
+    name = None
+    lines = []
+    with open(file_path,"r",encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("@"):
+                if name is not None:
+                    yield name, "".join([c for c in "".join(lines) if c in "ACGT"])
+                name = line[1:].rstrip("\n")
+                lines = []
+            elif name is not None:
+                lines.append(line)
+    if name is not None:
+        yield name, "".join([c for c in "".join(lines) if c in "ACGT"])
+
+COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+# the 4^ko x 4 log-probability table is only chosen automatically up to this depth (16 MB at 10)
+# and when it has no more rows than the reference has symbols, so filling it never costs more
+# than counting; deeper or sparser models keep the dict path
+DENSE_MAX_KO = 10
+
+def encode_symbols(text: str):
+    # ACGT -> 0..3 as a numpy array, None if text has any other symbol
+    import numpy as np
+
+    codes = np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8)
+    lookup = np.full(256, 255, dtype=np.uint8)
+    lookup[np.frombuffer(b"ACGT", dtype=np.uint8)] = np.arange(4, dtype=np.uint8)
+    codes = lookup[codes]
+    if (codes == 255).any():
+        return None
+    return codes
+
+def count_contexts(text: str, ko: int, inverted_repeats: bool = False)-> dict:
+    table = {}
+    # the reverse complement of the window text[i:i+ko+1] is reverse[n-i-1:n-i+ko],
+    # so both strands are counted in the same pass
+    reverse = text[::-1].translate(COMPLEMENT) if inverted_repeats else ""
+    n = len(text) - ko
+    for i in range(n):
+        context = text[i:i+ko]
+        next_char = text[i+ko]
+        
+        context_table, total = table.get(context,({},0))
+        count = context_table.get(next_char,0)
+        
+        context_table[next_char] = count + 1
+        table[context] = (context_table, total + 1)
+
+        if inverted_repeats:
+            j = n - i - 1
+            context = reverse[j:j+ko]
+            next_char = reverse[j+ko]
+
+            context_table, total = table.get(context,({},0))
+            context_table[next_char] = context_table.get(next_char,0) + 1
+            table[context] = (context_table, total + 1)
+        
+    return table
+
+def count_keys(text: str, ko: int, inverted_repeats: bool = False):
+    # the counts of count_contexts as sorted (key, count) arrays, a key being the 2-bit codes
+    # of context and symbol; None if text is not pure ACGT. Arrays pickle cheaply between processes
+    import numpy as np
+
+    codes = encode_symbols(text)
+    if codes is None:
+        return None
+    strands = [codes, 3 - codes[::-1]] if inverted_repeats else [codes]
+    n = len(codes) - ko
+    keys = np.zeros((len(strands), max(n, 0)), dtype=np.uint64)
+    for strand, strand_keys in zip(strands, keys):
+        for j in range(ko + 1):
+            strand_keys <<= np.uint64(2)
+            strand_keys |= strand[j:j+n].astype(np.uint64)
+    return np.unique(keys, return_counts=True)
+
+def table_from_keys(keys, counts, ko: int)-> dict:
+    # dict table of count_contexts from sorted unique keys and their counts
+    import numpy as np
+
+    contexts, first = np.unique(keys >> np.uint64(2), return_index=True)
+    totals = np.add.reduceat(counts, first).tolist() if len(keys) else []
+    letters = np.frombuffer(b"ACGT", dtype=np.uint8)
+    shifts = np.arange(2 * (ko - 1), -1, -2, dtype=np.uint64)
+    context_codes = letters[(contexts[:, None] >> shifts) & np.uint64(3)]
+    names = np.frombuffer(context_codes.tobytes(), dtype=f"S{ko}").astype(f"U{ko}") if ko else np.full(len(contexts), "")
+    entry_contexts = names[np.repeat(np.arange(len(contexts)), np.diff(np.append(first, len(keys))))]
+    entry_symbols = np.array(list("ACGT"))[keys & np.uint64(3)]
+
+    tables = {}
+    for context, symbol, count in zip(entry_contexts.tolist(), entry_symbols.tolist(), counts.tolist()):
+        tables.setdefault(context, {})[symbol] = count
+    return {context: (context_table, total) for (context, context_table), total in zip(tables.items(), totals)}
+
+def merge_tables(table: dict, other: dict)-> dict:
+    # adds the counts of other into table, in place
+    for context, (other_context_table, other_total) in other.items():
+        context_table, total = table.get(context,({},0))
+        for next_char, count in other_context_table.items():
+            context_table[next_char] = context_table.get(next_char,0) + count
+        table[context] = (context_table, total + other_total)
+    return table
+
 class Model: 
-    def __init__(self, text: str, ko: int, alpha: float):
+    def __init__(self, text: str, ko: int, alpha: float, workers: int = 1, inverted_repeats: bool = False, dense: bool | None = None):
         self.ko = ko
         self.alpha = alpha
-        self.alphabet = set(text)
-        self.table = self.build_table(text)
+        # inverted repeats also count the reverse-complement strand in the same table
+        self.inverted_repeats = inverted_repeats
+        self.alphabet = self.symbols(text)
+        self.table = self.build_table(text, workers)
+        # last ko symbols seen, so update() can count the contexts crossing the seam
+        self.tail = text[max(0, len(text) - ko):]
+        self.version = 0
+        # changes[v] holds the contexts touched going from version v to v+1,
+        # or None when the alphabet grew and every score is affected
+        self.changes = []
+        # dense: flat log-probability table indexed by context code, chosen by size unless given
+        if dense is None:
+            dense = ko <= DENSE_MAX_KO and 4 ** ko <= len(text)
+        self.dense = self.build_dense() if dense and self.alphabet <= set("ACGT") else None
         
-    def build_table(self, text: str):
-        table = {}
-        for i in range(len(text) - self.ko):
-            context = text[i:i+self.ko]
-            next_char = text[i+self.ko]
-            
-            context_table, total = table.get(context,({},0))
-            count = context_table.get(next_char,0)
-            
-            context_table[next_char] = count + 1
-            table[context] = (context_table, total + 1)
-            
-        return table
+    def build_table(self, text: str, workers: int = 1):
+        n = len(text) - self.ko
+        if workers <= 1 or n < workers * 4096:
+            return count_contexts(text, self.ko, self.inverted_repeats)
+
+        # chunk i counts the contexts starting in [start, end), so it needs ko extra symbols;
+        # workers return numpy keys, merged by sorting instead of adding dicts one entry at a time
+        import numpy as np
+
+        if 2 * (self.ko + 1) > 64 or not self.alphabet <= set("ACGT"):
+            return count_contexts(text, self.ko, self.inverted_repeats)
+        bounds = [n * i // workers for i in range(workers + 1)]
+        chunks = [text[bounds[i]:bounds[i+1] + self.ko] for i in range(workers)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(count_keys, chunks, [self.ko] * workers, [self.inverted_repeats] * workers))
+
+        keys = np.concatenate([part[0] for part in parts])
+        counts = np.concatenate([part[1] for part in parts])
+        order = np.argsort(keys, kind="stable")
+        keys, counts = keys[order], counts[order]
+        unique, first = np.unique(keys, return_index=True)
+        counts = np.add.reduceat(counts, first) if len(keys) else counts
+        return table_from_keys(unique, counts, self.ko)
+
+    def build_dense(self):
+        # bits of every (context, symbol) as float32; rows of unseen contexts stay at the
+        # uniform cost log2(|alphabet|), which is what (0+alpha)/(0+alpha*|alphabet|) gives
+        import numpy as np
+
+        dense = np.full((4 ** self.ko, 4), log2(len(self.alphabet)) if self.alphabet else 0, dtype=np.float32)
+        self.fill_dense(dense, self.table)
+        return dense
+
+    def fill_dense(self, dense, contexts):
+        # rewrites the rows of the given contexts from the current counts
+        import numpy as np
+
+        contexts = list(contexts)
+        if not contexts:
+            return
+        const_term = self.alpha * len(self.alphabet)
+        codes = encode_symbols("".join(contexts)).reshape(len(contexts), self.ko).astype(np.int64)
+        rows = codes @ (4 ** np.arange(self.ko - 1, -1, -1, dtype=np.int64))
+        counts = np.array([[self.table[c][0].get(symbol,0) for symbol in "ACGT"] for c in contexts], dtype=np.float64)
+        totals = np.array([self.table[c][1] for c in contexts], dtype=np.float64)
+        dense[rows] = -np.log2((counts + self.alpha) / (totals[:, None] + const_term))
+
+    def dense_bits(self, text: str):
+        # per-symbol bits by gathering from the dense table, None if text is not pure ACGT
+        import numpy as np
+
+        codes = encode_symbols(text)
+        if codes is None:
+            return None
+        n = len(codes) - self.ko
+        if n <= 0:
+            return np.zeros(0, dtype=np.float32)
+        rows = np.zeros(n, dtype=np.int64)
+        for j in range(self.ko):
+            rows *= 4
+            rows += codes[j:j+n]
+        return self.dense[rows, codes[self.ko:]]
+
+    def symbols(self, text: str)-> set[str]:
+        alphabet = set(text)
+        if self.inverted_repeats:
+            alphabet |= set("".join(alphabet).translate(COMPLEMENT))
+        return alphabet
+
+    def merge(self, other: "Model")-> "Model":
+        # combines a model built on another reference without recounting either
+        if other.ko != self.ko:
+            raise ValueError(f"cannot merge models of depth {self.ko} and {other.ko}")
+        if other.inverted_repeats != self.inverted_repeats:
+            raise ValueError("cannot merge models with and without inverted repeats")
+        merge_tables(self.table, other.table)
+        self._record(set(other.table), other.alphabet)
+        self.refresh_dense(self.changes[-1])
+        return self
+
+    def update(self, text: str)-> set[str]:
+        # counts appended reference data, including the contexts that start in the previous tail
+        seam = self.tail + text
+        partial = count_contexts(seam, self.ko, self.inverted_repeats)
+        merge_tables(self.table, partial)
+        self.tail = seam[max(0, len(seam) - self.ko):]
+        self._record(set(partial), self.symbols(text))
+        self.refresh_dense(self.changes[-1])
+        return set(partial)
+
+    def refresh_dense(self, contexts: set[str] | None = None):
+        # only the rows of changed contexts move; a grown alphabet changes every row, so rebuild
+        if self.dense is None:
+            return
+        if contexts is None:
+            self.dense = self.build_dense() if self.alphabet <= set("ACGT") else None
+        else:
+            self.fill_dense(self.dense, contexts)
+
+    def _record(self, contexts: set[str], alphabet: set[str]):
+        grew = not alphabet <= self.alphabet
+        self.alphabet |= alphabet
+        self.changes.append(None if grew else contexts)
+        self.version += 1
+
+    def changed_since(self, version: int)-> set[str] | None:
+        # contexts whose counts changed after version, None if everything may have changed
+        changed = set()
+        for contexts in self.changes[version:]:
+            if contexts is None:
+                return None
+            changed |= contexts
+        return changed
 
     def estimate_bits(self, text: str)-> float:
+        if self.dense is not None and (bits := self.dense_bits(text)) is not None:
+            return float(bits.sum(dtype="float64"))
         _sum = 0
         const_term = self.alpha * len(self.alphabet)
         for i in range(len(text) - self.ko):
@@ -58,9 +280,30 @@ class Model:
             _sum += symbol_information
             
         return -_sum/log(2)
-    
-    def nrc(self, x: str)-> float:
-        content = self.estimate_bits(x)
+
+    def symbol_bits(self, text: str)-> list[float]:
+        # bits[i] is the information of text[i+ko] given its context
+        if self.dense is not None and (bits := self.dense_bits(text)) is not None:
+            return bits.astype("float64").tolist()
+        bits = []
+        const_term = self.alpha * len(self.alphabet)
+        for i in range(len(text) - self.ko):
+            context = text[i:i+self.ko]
+            next_char = text[i+self.ko]
+            context_table, total = self.table.get(context,({},0))
+            count = context_table.get(next_char,0)
+
+            bits.append(-log2(( count+self.alpha) / (total+const_term)))
+
+        return bits
+
+    def releases_gil(self)-> bool:
+        # True when scoring runs in numpy, so threads can share the model
+        return self.dense is not None
+
+    def nrc(self, x: str, content: float | None = None)-> float:
+        if content is None:
+            content = self.estimate_bits(x)
         length_x = len(x)
         alphabet_x = set(x)
         return content / (length_x * log(len(alphabet_x),2)) 
@@ -107,6 +350,263 @@ def print_table(res, top,csv = False):
     # Print bottom border
     print(f"{BOTTOM_LEFT}{HORIZONTAL * (NRC_WIDTH + 2)}{BOTTOM_MIDDLE}{HORIZONTAL * (IDENTIFIER_WIDTH+2)}{BOTTOM_RIGHT}")
 
+def load_database(file_path: str)-> list[tuple[str,str]]:
+    return parse_database(open_file(file_path))
+
+def build_model(file_path: str, ko: int, alpha: float, workers: int = 1, inverted_repeats: bool = False,
+                external: str | None = None, memory_mb: int = 1024)-> Model:
+    if external is not None:
+        # exact out-of-core table in the external directory, reused when it was built
+        # from the same file (path, size and mtime) with the same depth
+        from external import build_disk_model, is_current, DiskModel
+
+        if inverted_repeats:
+            raise ValueError("inverted repeats are not supported by external models")
+        if not is_current(external, file_path, ko):
+            build_disk_model(file_path, ko, external, memory_mb)
+        return DiskModel(external, alpha)
+
+    sequence_text = open_file(file_path)
+    sequence_text = "".join([c for c in sequence_text if c in "ACGT"])
+    return Model(sequence_text, ko, alpha, workers, inverted_repeats)
+
+def split_sequence(text: str, ko: int, chunk_size: int)-> list[str]:
+    # chunks whose contexts tile the sequence; each one repeats the ko symbols before its first prediction
+    n = len(text) - ko
+    if n <= chunk_size:
+        return [text]
+    return [text[start:min(start + chunk_size, n) + ko] for start in range(0, n, chunk_size)]
+
+# model scored by the processes of scoring_executor; inherited through fork or set by the initializer
+_scoring_model = None
+
+def _set_scoring_model(model: Model):
+    global _scoring_model
+    _scoring_model = model
+
+def _estimate_bits(text: str)-> float:
+    return _scoring_model.estimate_bits(text)
+
+def scoring_executor(model: Model, workers: int):
+    # (executor, function) scoring chunks against model. The numpy paths release the GIL and run
+    # in threads; the dict path holds it, so it runs in processes that get the model once, for
+    # free through fork when no other thread could be holding a lock, else through the initializer
+    # of fresh forkserver (or spawn) processes, which never copy another thread's locks
+    if model.releases_gil():
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers), model.estimate_bits
+    import multiprocessing
+    import os
+    import threading
+
+    workers = min(workers, os.cpu_count() or 1)
+    if "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1:
+        _set_scoring_model(model)
+        context = multiprocessing.get_context("fork")
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context), _estimate_bits
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                      initializer=_set_scoring_model, initargs=(model,))
+    return executor, _estimate_bits
+
+def score(database: list[tuple[str,str]], model: Model, workers: int = 16, progress = None, chunk_size: int = 1 << 20):
+    # NRC of every database sequence, in database order; progress() is called per finished sequence.
+    # Long sequences are scored as several chunks, largest first, so no single genome is a straggler.
+    import numpy as np
+
+    tasks = []
+    for i, (_, seq) in enumerate(database):
+        for chunk in split_sequence(seq, model.ko, chunk_size):
+            tasks.append((len(chunk), i, chunk))
+    tasks.sort(key=lambda x: x[0], reverse=True)
+
+    bits = np.zeros(len(database), dtype=np.float64)
+    pending = np.zeros(len(database), dtype=np.int64)
+    for _, i, _ in tasks:
+        pending[i] += 1
+
+    nrcs = np.zeros(len(database), dtype=np.float64)
+    executor, estimate_bits = scoring_executor(model, workers)
+    with executor:
+        futures = {executor.submit(estimate_bits, chunk): i for _, i, chunk in tasks}
+
+        for future in concurrent.futures.as_completed(futures):
+            i = futures[future]
+            bits[i] += future.result()
+            pending[i] -= 1
+            if pending[i] == 0:
+                nrcs[i] = model.nrc(database[i][1], bits[i])
+                if progress is not None:
+                    progress()
+    return nrcs
+
+def rank(database: list[tuple[str,str]], nrcs, top: int | None = None)-> list[tuple[str,float]]:
+    # most similar first, i.e. ascending NRC
+    import numpy as np
+
+    order = np.argsort(nrcs, kind="stable")[:top]
+    return [(database[i][0], float(nrcs[i])) for i in order]
+
+def rank_anytime(database: list[tuple[str,str]], model: Model, deadline: float, top: int, probe: int = 1000, chunk_size: int = 1 << 16):
+    # generator for interactive use: yields (ranking, scored, finished) every time the top
+    # improves and once more at the end; deadline is a time.perf_counter() value.
+    # Sequences are scored in order of the NRC of their first `probe` symbols, so the likely
+    # best matches are ranked first; a sequence cut off by the deadline is left out.
+    priority = []
+    for name, seq in database:
+        if time.perf_counter() >= deadline or len(set(seq[:probe])) < 2:
+            priority.append(inf)
+        else:
+            priority.append(model.nrc(seq[:probe]))
+    order = sorted(range(len(database)), key=lambda i: (priority[i], len(database[i][1])))
+
+    best = []
+    scored = 0
+    for i in order:
+        name, seq = database[i]
+        bits = 0.0
+        for chunk in split_sequence(seq, model.ko, chunk_size):
+            if time.perf_counter() >= deadline:
+                yield list(best), scored, False
+                return
+            bits += model.estimate_bits(chunk)
+        scored += 1
+        if len(set(seq)) < 2:
+            continue
+        nrc = model.nrc(seq, bits)
+        if len(best) < top or nrc < best[-1][1]:
+            bisect.insort(best, (name, nrc), key=lambda x: x[1])
+            del best[top:]
+            yield list(best), scored, False
+    yield list(best), scored, True
+
+class ScoreCache:
+    # keeps the NRCs of a database against a model that grows through Model.update
+    def __init__(self, database: list[tuple[str,str]], model: Model, workers: int = 16):
+        self.database = database
+        self.model = model
+        self.workers = workers
+        # contexts[i] holds the sorted 2-bit codes of the contexts sequence i is scored with,
+        # None when they cannot be encoded (then the sequence is always rescored)
+        self.contexts = [self.context_codes(seq) for _, seq in database]
+        self.version = model.version
+        self.nrcs = score(database, model, workers)
+
+    def context_codes(self, seq: str):
+        import numpy as np
+
+        if not 0 < self.model.ko <= 31 or (keys := count_keys(seq, self.model.ko)) is None:
+            return None
+        return np.unique(keys[0] >> np.uint64(2))
+
+    def refresh(self)-> list[int]:
+        # rescores only the sequences that contain a changed context; returns their indices
+        import numpy as np
+
+        changed = self.model.changed_since(self.version)
+        if changed is not None and not changed:
+            affected = []
+        elif changed is None or not 0 < self.model.ko <= 31:
+            affected = list(range(len(self.database)))
+        else:
+            changed = list(changed)
+            if (codes := encode_symbols("".join(changed))) is None:
+                # contexts with other symbols cannot occur in an encodable sequence
+                changed = [context for context in changed if not context.strip("ACGT")]
+                codes = encode_symbols("".join(changed))
+            keys = np.zeros(len(changed), dtype=np.uint64)
+            for j in range(self.model.ko if changed else 0):
+                keys <<= np.uint64(2)
+                keys |= codes[j::self.model.ko].astype(np.uint64)
+            keys.sort()
+            affected = []
+            for i, contexts in enumerate(self.contexts):
+                if contexts is None:
+                    affected.append(i)
+                elif len(keys):
+                    found = np.minimum(np.searchsorted(keys, contexts), len(keys) - 1)
+                    if (keys[found] == contexts).any():
+                        affected.append(i)
+        if affected:
+            subset = [self.database[i] for i in affected]
+            self.nrcs[affected] = score(subset, self.model, self.workers)
+        self.version = self.model.version
+        return affected
+
+    def rank(self, top: int | None = None)-> list[tuple[str,float]]:
+        return rank(self.database, self.nrcs, top)
+
+async def run_pipeline(args, workers: int = 16, queue_size: int = 64, chunk_size: int = 1 << 20)-> list[tuple[str,float]]:
+    # reading/parsing the database overlaps with building the model; the bounded
+    # queue blocks the reader when the scorers fall behind
+    import asyncio
+    import threading
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    stop = threading.Event()
+
+    def produce():
+        count = 0
+        try:
+            for record in iter_database(args.data):
+                if stop.is_set():
+                    return count
+                asyncio.run_coroutine_threadsafe(queue.put(record), loop).result()
+                count += 1
+        finally:
+            # always release the scorers, even if reading failed
+            for _ in range(workers):
+                if stop.is_set():
+                    break
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+        return count
+
+    nrcs = []
+    async def consume():
+        while (record := await queue.get()) is not None:
+            name, seq = record
+            # same chunking as score, so one long genome does not hold a scorer alone
+            chunks = split_sequence(seq, model.ko, chunk_size)
+            bits = await asyncio.gather(*(loop.run_in_executor(scorer, estimate_bits, chunk) for chunk in chunks))
+            nrc = model.nrc(seq, sum(bits))
+            if args.verbose and not nrcs:
+                print_log("[INFO] Pipeline: first result ready")
+            nrcs.append((name, nrc))
+
+    producer = loop.run_in_executor(executor, produce)
+    consumers = []
+    scorer = None
+    try:
+        model = await loop.run_in_executor(executor, build_model, args.sequence, args.context, args.alpha, args.jobs, args.inverted_repeats, args.external, args.memory)
+        if args.verbose:
+            print_log(f"[INFO] Model: created with depth {args.context} and alpha {args.alpha}")
+
+        scorer, estimate_bits = scoring_executor(model, workers)
+        consumers = [asyncio.ensure_future(consume()) for _ in range(workers)]
+        await asyncio.gather(*consumers)
+        count = await producer
+    finally:
+        # on failure, stop the reader and unblock any put it is waiting on before leaving the loop
+        stop.set()
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait([producer], timeout=0.05)
+        if not producer.cancelled():
+            producer.exception()
+        executor.shutdown(cancel_futures=True)
+        if scorer is not None:
+            scorer.shutdown(cancel_futures=True)
+
+    if args.verbose:
+        print_log(f"[INFO] Database: streamed {count} sequences")
+    return nrcs
+
 def main():
     parser = argparse.ArgumentParser(description="MetaClass: find similar sequences.")
     parser.add_argument("-d","--data", type=str, required=True, help="Database file")
@@ -116,45 +616,59 @@ def main():
     parser.add_argument("-t","--top", type=int, default=20 , help="Top N similar sequences")
     parser.add_argument("-v","--verbose", action="store_true", help="Print verbose")
     parser.add_argument("-c","--csv", action="store_true", help="Output in CSV format")
+    parser.add_argument("-j","--jobs", type=int, default=1 , help="Processes used to build the model")
+    parser.add_argument("-i","--inverted-repeats", action="store_true", help="Also count reverse-complement contexts")
+    parser.add_argument("-e","--external", type=str, help="Directory of an exact on-disk model, built if missing")
+    parser.add_argument("-m","--memory", type=int, default=1024 , help="Memory budget in MB for building the on-disk model")
+    parser.add_argument("-p","--pipeline", action="store_true", help="Overlap reading, model building and scoring")
+    parser.add_argument("--deadline", type=float, help="Return the best ranking found within this many seconds")
     
     args = parser.parse_args()
+    start = time.perf_counter()
+
+    if args.deadline is not None:
+        sequences = load_database(args.data)
+        model = build_model(args.sequence, args.context, args.alpha, args.jobs, args.inverted_repeats, args.external, args.memory)
+        if args.verbose:
+            print_log(f"[INFO] Model: created with depth {args.context} and alpha {args.alpha}")
+        for best, scored, finished in rank_anytime(sequences, model, start + args.deadline, args.top):
+            if best and not finished:
+                # intermediate rankings go to stderr so stdout keeps only the final table
+                print_log(f"[INFO] Anytime: {scored}/{len(sequences)} scored, best {best[0][1]:.4f} {best[0][0]}", file=sys.stderr)
+        state = "all" if finished else "deadline reached,"
+        print_log(f"[INFO] Anytime: {state} {scored}/{len(sequences)} sequences fully scored", file=sys.stderr)
+        print_table(best, min(args.top, len(best)), args.csv)
+        return
+
+    if args.pipeline:
+        import asyncio
+        nrcs = asyncio.run(run_pipeline(args))
+        nrcs.sort(key=lambda x: x[1])
+        if args.verbose:
+            print_log(f"[INFO] Similarity: calculated for {len(nrcs)} sequences")
+        print_table(nrcs, args.top, args.csv)
+        return
     
-    database_text = open_file(args.data)
-    sequences = parse_database(database_text)
+    sequences = load_database(args.data)
     if args.verbose:
         print_log(f"[INFO] Database: loaded {len(sequences)} sequences")
-    
-    sequence_text = open_file(args.sequence)
-    sequence_text = "".join([c for c in sequence_text if c in "ACGT"])
 
-    model = Model(sequence_text, args.context, args.alpha)
+    model = build_model(args.sequence, args.context, args.alpha, args.jobs, args.inverted_repeats, args.external, args.memory)
     if args.verbose:
         print_log(f"[INFO] Model: created with depth {args.context} and alpha {args.alpha}")
-        
-    def compute_nrc(seq):
-        return seq[0], model.nrc(seq[1]) 
-    
-    progress_bar = tqdm(total=len(sequences), desc="Processing NRCs", ncols=100)
-
-    nrcs = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
-        futures = {executor.submit(compute_nrc, seq): seq for seq in sequences}
-
-        for future in concurrent.futures.as_completed(futures):
-            nrcs.append(future.result())  
-            progress_bar.update(1)  
 
+    from tqdm import tqdm
+    # no monitor thread, so score() can still fork its workers safely
+    tqdm.monitor_interval = 0
+    progress_bar = tqdm(total=len(sequences), desc="Processing NRCs", ncols=100)
+    nrcs = score(sequences, model, progress=lambda: progress_bar.update(1))
     progress_bar.close()
-    print("\033[F\033[K", end="") 
-   
-        
-    nrcs.sort(key=lambda x: x[1])
+    print("\033[F\033[K", end="")
+
     if args.verbose:
         print_log(f"[INFO] Similarity: calculated for {len(nrcs)} sequences")
-        
-    print_table(nrcs, args.top, args.csv)
-    
-    return 
+
+    print_table(rank(sequences, nrcs), args.top, args.csv)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,9 @@
-import json
 import os
 import matplotlib.pyplot as plt
 import numpy as np
 
+from results_store import store_for, query_runs
+
 file_paths = {
     "java": "tests_results_java.json",
     "python": "tests_results_python.json",
@@ -23,14 +24,13 @@ for impl, path in file_paths.items():
     impl_data = {k: [] for k in target_ks}
     mem_data = {k: [] for k in target_ks}
 
-    with open(path, "r") as f:
-        data = json.load(f).get(impl, [])
+    results_store = store_for(os.path.abspath(path))
+    rows = query_runs(results_store, ["contextWidth", "time", "memoryMB"], impl=impl, ks=target_ks)
+    results_store.close()
 
-    for test in data:
-        k = test.get("contextWidth")
-        if k in target_ks:
-            impl_data[k].append(test.get("time", 0))
-            mem_data[k].append(test.get("memoryMB", 0))
+    for k, elapsed_time, memory in rows:
+        impl_data[k].append(elapsed_time or 0)
+        mem_data[k].append(memory or 0)
 
     time_data[impl] = [np.mean(impl_data[k]) if impl_data[k] else 0 for k in target_ks]
     memory_data[impl] = [np.mean(mem_data[k]) if mem_data[k] else 0 for k in target_ks]
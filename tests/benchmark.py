@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+import tempfile
+import threading
+import time
+import concurrent.futures
+
+c_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../C/meta"))
+cpp_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../cpp/meta"))
+zig_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../zig/meta"))
+rust_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../rust/metaclass/target/release/sequence_similarity"))
+jar_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../java/target/tai-1.0-SNAPSHOT.jar"))
+python_script = os.path.abspath(os.path.join(os.path.dirname(__file__), "../python/meta.py"))
+file_meta = os.path.abspath(os.path.join(os.path.dirname(__file__), "../sequences/meta.txt"))
+file_db = os.path.abspath(os.path.join(os.path.dirname(__file__), "../sequences/db.txt"))
+output_file = os.path.abspath(os.path.join(os.path.dirname(__file__), "benchmark_results.jsonl"))
+
+implementations = ["java", "python", "rust", "c", "cpp", "zig"]
+alpha_values = [1, 0.015, 0.001]
+k_values = [6, 10, 15, 20]
+t_value = 20
+
+write_lock = threading.Lock()
+
+# cursor movement/erase sequences, e.g. meta.py clears its progress line before the CSV output
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+def build_command(impl, alpha, k, db=file_db, meta=file_meta):
+    """Returns the command line that runs one implementation."""
+    if impl == "java":
+        return ["java", "-jar", jar_path, "-fm", meta, "-fd", db, "-a", str(alpha), "-k", str(k), "-t", str(t_value)]
+    if impl == "python":
+        return ["python3", python_script, "-d", db, "-s", meta, "-a", str(alpha), "-k", str(k), "-t", str(t_value), "-c"]
+    if impl == "rust":
+        return [rust_path, "-d", db, "-s", meta, "-k", str(k), "-a", str(alpha), "-c"]
+    if impl == "c":
+        return [c_path, "-d", db, "-s", meta, "-k", str(k), "-a", str(alpha)]
+    if impl == "cpp":
+        return [cpp_path, "-d", db, "-s", meta, "-k", str(k), "-a", str(alpha), "-c"]
+    if impl == "zig":
+        return [zig_path, "-d", db, "-s", meta, "-k", str(k), "-a", str(alpha)]
+    raise ValueError(f"Unknown implementation: {impl}")
+
+def peak_rss_mb(rusage):
+    """ru_maxrss is in kilobytes on Linux and in bytes on macOS."""
+    if sys.platform == "darwin":
+        return rusage.ru_maxrss / (1024 * 1024)
+    return rusage.ru_maxrss / 1024
+
+def parse_results(stdout):
+    """Parses 'score<TAB>name' lines printed by every implementation."""
+    results = []
+    for line in ANSI_ESCAPE.sub("", stdout).strip().split("\n"):
+        parts = line.split("\t")
+        if len(parts) == 2:
+            try:
+                results.append({"score": float(parts[0]), "name": parts[1]})
+            except ValueError:
+                continue
+    return results
+
+def run_once(cmd):
+    """Runs a command and returns (returncode, stdout, stderr, elapsed, peak memory).
+
+    The child is reaped with os.wait4 so its rusage belongs to that process only;
+    getrusage(RUSAGE_CHILDREN) would mix in every other child when runs are parallel.
+    """
+    with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+        start_time = time.perf_counter()
+        process = subprocess.Popen(cmd, stdout=out, stderr=err, text=True)
+        _, status, rusage = os.wait4(process.pid, 0)
+        elapsed_time = time.perf_counter() - start_time
+        process.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        return process.returncode, out.read(), err.read(), elapsed_time, peak_rss_mb(rusage)
+
+def append_result(record, path=output_file):
+    """Appends one run and forces it to disk so a crash never loses finished runs."""
+    with write_lock:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def load_results(path=output_file):
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn last line after a crash
+    return records
+
+def run_key(record):
+    """Identifies a measured run; runs on other inputs or parallelism are never reused."""
+    return (record["impl"], record["alpha"], record["contextWidth"], record["repetition"],
+            record.get("data"), record.get("sequence"), record.get("jobs"))
+
+def run_benchmark(impl, alpha, k, repetition, warmup, db=file_db, meta=file_meta, jobs=1, path=output_file):
+    cmd = build_command(impl, alpha, k, db, meta)
+    try:
+        for _ in range(warmup):
+            run_once(cmd)
+        returncode, stdout, stderr, elapsed_time, peak_memory = run_once(cmd)
+    except OSError as e:
+        # e.g. an implementation that has not been built; the other runs still go ahead
+        print(f"Skipping {impl} with alpha={alpha}, k={k}: {e}")
+        return None
+    if returncode != 0 and stderr.strip():
+        print(f"Error running {impl} with alpha={alpha}, k={k}: {stderr}")
+        return None
+    results = parse_results(stdout)
+    record = {
+        "impl": impl,
+        "alpha": alpha,
+        "contextWidth": k,
+        "repetition": repetition,
+        "data": db,
+        "sequence": meta,
+        "jobs": jobs,
+        "top": t_value,
+        "time": elapsed_time,
+        "memoryMB": peak_memory,
+        "results": results
+    }
+    append_result(record, path)
+    print(f"{impl:>6} alpha={alpha:<8} k={k:<3} rep={repetition}: {elapsed_time:.3f}s {peak_memory:.1f}MB")
+    return record
+
+def group_by_config(records):
+    groups = {}
+    for record in records:
+        key = (record["impl"], record["alpha"], record["contextWidth"])
+        groups.setdefault(key, []).append(record)
+    return groups
+
+def check_rankings(records):
+    """Reports configurations where implementations disagree on the ranking."""
+    rankings = {}
+    for (impl, alpha, k), runs in group_by_config(records).items():
+        names = [r["name"] for r in sorted(runs[0]["results"], key=lambda x: x["score"])]
+        rankings.setdefault((alpha, k), {})[impl] = names
+
+    disagreements = 0
+    for (alpha, k), by_impl in sorted(rankings.items()):
+        reference_impl, reference = next(iter(by_impl.items()))
+        for impl, names in by_impl.items():
+            if names != reference:
+                common = len(set(names) & set(reference))
+                print(f"[RANK] alpha={alpha} k={k}: {impl} differs from {reference_impl} ({common}/{len(reference)} shared in top)")
+                disagreements += 1
+    if disagreements == 0:
+        print("[RANK] All implementations agree on the rankings")
+    return disagreements
+
+def welch_t(sample, baseline):
+    """Welch's t statistic of sample against baseline (positive means slower)."""
+    var_s = statistics.variance(sample) / len(sample)
+    var_b = statistics.variance(baseline) / len(baseline)
+    diff = statistics.mean(sample) - statistics.mean(baseline)
+    if var_s + var_b == 0:
+        return float("inf") if diff > 0 else 0.0
+    return diff / (var_s + var_b) ** 0.5
+
+def save_baseline(records, path, jobs):
+    baseline = {
+        "jobs": jobs,
+        "times": {
+            f"{impl}|{alpha}|{k}": [r["time"] for r in runs]
+            for (impl, alpha, k), runs in group_by_config(records).items()
+        }
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=4)
+    print(f"Baseline saved to: {path}")
+
+def compare_baseline(records, path, t_threshold, min_slowdown, jobs):
+    """Flags configurations whose time is significantly worse than the baseline.
+
+    Returns None when the baseline was measured with a different number of parallel runs,
+    since contention makes those times incomparable.
+    """
+    with open(path, "r") as f:
+        baseline = json.load(f)
+    if baseline.get("jobs") != jobs:
+        print(f"[SLOW] Baseline was measured with {baseline.get('jobs')} parallel runs, not {jobs}; refusing to compare")
+        return None
+    baseline = baseline["times"]
+
+    regressions = 0
+    for (impl, alpha, k), runs in sorted(group_by_config(records).items()):
+        times = [r["time"] for r in runs]
+        base = baseline.get(f"{impl}|{alpha}|{k}")
+        if not base or len(base) < 2 or len(times) < 2:
+            continue
+        slowdown = statistics.mean(times) / statistics.mean(base) - 1
+        t = welch_t(times, base)
+        if t > t_threshold and slowdown > min_slowdown:
+            print(f"[SLOW] {impl} alpha={alpha} k={k}: {slowdown * 100:+.1f}% (t={t:.2f})")
+            regressions += 1
+    if regressions == 0:
+        print("[SLOW] No significant slowdowns against the baseline")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-implementation performance regression harness.")
+    parser.add_argument("-i", "--impl", nargs="+", default=implementations, help="Implementations to run")
+    parser.add_argument("-k", "--context", type=int, nargs="+", default=k_values, help="Context widths")
+    parser.add_argument("-a", "--alpha", type=float, nargs="+", default=alpha_values, help="Smoothing factors")
+    parser.add_argument("-d", "--data", type=str, default=file_db, help="Database file")
+    parser.add_argument("-s", "--sequence", type=str, default=file_meta, help="Meta sequence file")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Measured runs per configuration")
+    parser.add_argument("-w", "--warmup", type=int, default=1, help="Unmeasured runs before each measured run")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Runs executed in parallel")
+    parser.add_argument("-o", "--output", type=str, default=output_file, help="JSONL file runs are appended to")
+    parser.add_argument("-b", "--baseline", type=str, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", type=str, help="Save the collected times as a baseline")
+    parser.add_argument("--t-threshold", type=float, default=2.0, help="Welch t above which a slowdown is significant")
+    parser.add_argument("--min-slowdown", type=float, default=0.05, help="Relative slowdown ignored as noise")
+    args = parser.parse_args()
+
+    data = os.path.abspath(args.data)
+    sequence = os.path.abspath(args.sequence)
+    records = [
+        r for r in load_results(args.output)
+        if (r.get("data"), r.get("sequence"), r.get("jobs")) == (data, sequence, args.jobs)
+    ]
+    done = {run_key(r) for r in records}
+    pending = [
+        (impl, alpha, k, rep)
+        for impl in args.impl for alpha in args.alpha for k in args.context for rep in range(args.repeat)
+        if (impl, alpha, k, rep, data, sequence, args.jobs) not in done
+    ]
+    print(f"{len(done)} runs already stored, {len(pending)} to go")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(run_benchmark, impl, alpha, k, rep, args.warmup, data, sequence, args.jobs, args.output) for impl, alpha, k, rep in pending]
+        for future in concurrent.futures.as_completed(futures):
+            record = future.result()
+            if record:
+                records.append(record)
+
+    selected = [
+        r for r in records
+        if r["impl"] in args.impl and r["alpha"] in args.alpha and r["contextWidth"] in args.context
+    ]
+    check_rankings(selected)
+    if args.baseline:
+        if compare_baseline(selected, args.baseline, args.t_threshold, args.min_slowdown, args.jobs) is None:
+            sys.exit(1)
+    if args.save_baseline:
+        save_baseline(selected, args.save_baseline, args.jobs)
+
+if __name__ == "__main__":
+    main()
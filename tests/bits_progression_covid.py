@@ -1,45 +1,24 @@
 import matplotlib.pyplot as plt
 import os
-import sys
-import numpy as np
 
-def read_values_from_file(filename):
-    """Reads numerical values from a file, one per line."""
-    try:
-        with open(filename, 'r') as f:
-            values = [float(line.strip()) for line in f if line.strip()]
-        return values
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        sys.exit(1)
-
-def dynamic_window_size(length):
-    """Returns a smooth window size such that:
-    - ~700 -> ~30
-    - ~120000 -> ~20000
-    """
-    return max(1, int(0.0267 * length ** 1.1))
-
-def moving_average(values, window_size):
-    """Applies a simple moving average to smooth the values."""
-    if len(values) < window_size:
-        return values  # Not enough data to smooth
-    return np.convolve(values, np.ones(window_size) / window_size, mode='valid')
+from progression import read_values_from_file, dynamic_window_size, moving_average, downsample_minmax
 
 def plot_bits_estimation_progression(values, values2, output_file, sequence_name):
     """Plots the smoothed Bits Estimation progression and saves the image."""
     window_size = dynamic_window_size(len(values))
     smoothed_values = moving_average(values, window_size=window_size)
     smoothed_values2 =moving_average(values2,window_size)
+    positions, smoothed_values = downsample_minmax(smoothed_values)
+    positions2, smoothed_values2 = downsample_minmax(smoothed_values2)
     
     plt.figure(figsize=(10, 5))
     color_map = plt.colormaps.get_cmap("tab20")
     colors = [color_map(i / 11) for i in range(11)]
 
     # Plot using the extracted colors
-    plt.plot(range(len(smoothed_values)), smoothed_values, marker='o', linestyle='-', color=colors[1], markersize=3,
+    plt.plot(positions, smoothed_values, marker='o', linestyle='-', color=colors[1], markersize=3,
             label=f'1st Coronavirus NC_005831.2 (window={window_size})')
-    plt.plot(range(len(smoothed_values2)), smoothed_values2, marker='o', linestyle='-', color=colors[9], markersize=3, label=f'2nd Coronavirus gi_49169782 (window={window_size})')
+    plt.plot(positions2, smoothed_values2, marker='o', linestyle='-', color=colors[9], markersize=3, label=f'2nd Coronavirus gi_49169782 (window={window_size})')
     plt.xlabel("Position in Sequence")
     plt.ylabel("Bits Value")
     plt.title(f"Bits Progression of Coronavirus - NC_005831.2 vs gi_49169782")
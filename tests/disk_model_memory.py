@@ -0,0 +1,43 @@
+import os
+import sys
+import argparse
+import subprocess
+import tempfile
+
+python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../python"))
+file_meta = os.path.abspath(os.path.join(os.path.dirname(__file__), "../sequences/meta.txt"))
+
+def peak_rss_mb(code):
+    """Runs code in a fresh interpreter next to external.py and returns its peak RSS in MB."""
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=python_dir)
+    _, status, rusage = os.wait4(process.pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"child failed: {code}")
+    if sys.platform == "darwin":
+        return rusage.ru_maxrss / (1024 * 1024)
+    return rusage.ru_maxrss / 1024
+
+def check_budget(reference, k, budget, tolerance):
+    """Builds the on-disk model under budget MB and compares the peak RSS above the bare
+    interpreter (Python, numpy and external imported) with the budget."""
+    baseline = peak_rss_mb("import external")
+    with tempfile.TemporaryDirectory() as directory:
+        peak = peak_rss_mb(f"from external import build_disk_model; build_disk_model({reference!r}, {k}, {directory!r}, {budget})")
+    used = peak - baseline
+    ok = used <= budget * (1 + tolerance)
+    print(f"{'OK' if ok else 'OVER':>4} budget={budget}MB k={k}: {used:.0f}MB above a {baseline:.0f}MB baseline")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks that build_disk_model stays within its memory budget.")
+    parser.add_argument("-s", "--sequence", type=str, default=file_meta, help="Reference to count")
+    parser.add_argument("-k", "--context", type=int, default=14, help="Depth of the context")
+    parser.add_argument("-m", "--memory", type=int, nargs="+", default=[64, 256], help="Budgets in MB")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative overshoot")
+    args = parser.parse_args()
+
+    results = [check_budget(os.path.abspath(args.sequence), args.context, budget, args.tolerance) for budget in args.memory]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
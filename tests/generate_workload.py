@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+BASES = np.frombuffer(b"ACGT", dtype=np.uint8)
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+def parse_size(text):
+    """Parses sizes such as 500K, 20M or 2G into bytes."""
+    text = text.strip().upper().rstrip("B")
+    unit = text[-1] if text and text[-1] in SIZE_UNITS else ""
+    return int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+
+def random_codes(rng, length):
+    return rng.integers(0, 4, size=length, dtype=np.uint8)
+
+def mutate(rng, codes, rate):
+    """Applies substitutions (80%) and single-base insertions/deletions (10% each) at the given rate."""
+    if rate <= 0 or len(codes) == 0:
+        return codes.copy()
+    codes = codes.copy()
+    substituted = rng.random(len(codes)) < rate * 0.8
+    codes[substituted] = (codes[substituted] + rng.integers(1, 4, size=substituted.sum(), dtype=np.uint8)) % 4
+    codes = codes[rng.random(len(codes)) >= rate * 0.1]
+    inserted = np.flatnonzero(rng.random(len(codes)) < rate * 0.1)
+    return np.insert(codes, inserted, random_codes(rng, len(inserted)))
+
+def draw_length(rng, distribution, mean, sigma):
+    if distribution == "fixed":
+        return mean
+    if distribution == "uniform":
+        return int(rng.integers(max(1, int(mean * (1 - sigma))), int(mean * (1 + sigma)) + 1))
+    # lognormal with the requested mean, like real databases mixing short segments and whole genomes
+    mu = np.log(mean) - sigma ** 2 / 2
+    return max(1, int(rng.lognormal(mu, sigma)))
+
+def write_sequence(f, codes, line_width):
+    """Writes codes as ACGT lines of line_width symbols without a per-line Python loop."""
+    text = BASES[codes]
+    full = len(text) // line_width
+    block = np.full((full, line_width + 1), ord("\n"), dtype=np.uint8)
+    block[:, :line_width] = text[:full * line_width].reshape(full, line_width)
+    f.write(block.tobytes())
+    if len(text) > full * line_width:
+        f.write(text[full * line_width:].tobytes() + b"\n")
+
+def generate(args):
+    rng = np.random.default_rng(args.seed)
+    os.makedirs(args.out_dir, exist_ok=True)
+    db_path = os.path.join(args.out_dir, "db.txt")
+    meta_path = os.path.join(args.out_dir, "meta.txt")
+    truth_path = os.path.join(args.out_dir, "truth.json")
+
+    # the meta sample is a mix of source genomes; planted records are mutated pieces of them
+    sources = [random_codes(rng, args.meta_length // args.sources) for _ in range(args.sources)]
+    with open(meta_path, "wb") as f:
+        for source in sources:
+            write_sequence(f, source, args.line_width)
+
+    rates = np.linspace(args.mutation_min, args.mutation_max, args.planted) if args.planted else []
+    planted = []
+    for i, rate in enumerate(rates):
+        source = int(rng.integers(0, args.sources))
+        length = args.planted_length or draw_length(rng, args.length_dist, args.length_mean, args.length_sigma)
+        length = min(length, len(sources[source]))
+        start = int(rng.integers(0, len(sources[source]) - length + 1))
+        planted.append({
+            "name": f"planted_{i:05d} source={source} start={start} mutation={rate:.4f}",
+            "source": source,
+            "start": start,
+            "length": length,
+            "mutation": float(rate),
+            "codes": mutate(rng, sources[source][start:start + length], rate)
+        })
+
+    records = args.records
+    if args.size:
+        records = max(len(planted), int(parse_size(args.size) / (args.length_mean * (1 + 1 / args.line_width))))
+    background = max(0, records - len(planted))
+
+    # planted records are spread among the background ones at seeded positions
+    slots = set(rng.choice(background + len(planted), size=len(planted), replace=False).tolist())
+    planted_iter = iter(planted)
+    written = 0
+    with open(db_path, "wb") as f:
+        for slot in range(background + len(planted)):
+            if slot in slots:
+                record = next(planted_iter)
+                name, codes = record["name"], record.pop("codes")
+            else:
+                name = f"background_{written:08d}"
+                codes = random_codes(rng, draw_length(rng, args.length_dist, args.length_mean, args.length_sigma))
+            f.write(f"@{name}\n".encode("ascii"))
+            write_sequence(f, codes, args.line_width)
+            written += 1
+
+    truth = {
+        "seed": args.seed,
+        "records": written,
+        "meta_length": int(sum(len(s) for s in sources)),
+        # fewer mutations means more shared contexts, so lower NRC is expected first
+        "ranking": [p["name"] for p in sorted(planted, key=lambda p: p["mutation"])],
+        "planted": planted
+    }
+    with open(truth_path, "w") as f:
+        json.dump(truth, f, indent=4)
+
+    print(f"Database: {db_path} ({written} records, {os.path.getsize(db_path)} bytes)")
+    print(f"Meta: {meta_path} ({os.path.getsize(meta_path)} bytes)")
+    print(f"Ground truth: {truth_path}")
+
+def check(truth_path, results_path, min_recall=None, max_inversions=None):
+    """Compares 'score<TAB>name' output of any implementation with the ground truth ranking.
+
+    Returns 0 when the given thresholds are met and 1 otherwise, to be used as exit status.
+    """
+    with open(truth_path, "r") as f:
+        expected = json.load(f)["ranking"]
+    found = []
+    with open(results_path, "r") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) == 2:
+                found.append(parts[1])
+
+    top = found[:len(expected)]
+    recall = len(set(top) & set(expected)) / len(expected) if expected else 1.0
+    planted_order = [name for name in found if name in set(expected)]
+    positions = {name: i for i, name in enumerate(expected)}
+    inversions = sum(
+        1 for i in range(len(planted_order)) for j in range(i + 1, len(planted_order))
+        if positions[planted_order[i]] > positions[planted_order[j]]
+    )
+    print(f"Planted in top {len(expected)}: {recall * 100:.1f}%")
+    print(f"Order inversions among planted: {inversions}")
+
+    status = 0
+    if min_recall is not None and recall < min_recall:
+        print(f"FAIL: recall {recall * 100:.1f}% is below {min_recall * 100:.1f}%")
+        status = 1
+    if max_inversions is not None and inversions > max_inversions:
+        print(f"FAIL: {inversions} inversions, at most {max_inversions} allowed")
+        status = 1
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic synthetic databases and meta samples.")
+    parser.add_argument("-o", "--out-dir", type=str, default="workload", help="Output directory")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("-n", "--records", type=int, default=1000, help="Database records")
+    parser.add_argument("--size", type=str, help="Approximate database size (e.g. 500K, 20M, 2G); overrides --records")
+    parser.add_argument("--length-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal", help="Record length distribution")
+    parser.add_argument("--length-mean", type=int, default=5000, help="Mean record length")
+    parser.add_argument("--length-sigma", type=float, default=1.0, help="Spread of the length distribution")
+    parser.add_argument("--meta-length", type=int, default=1_000_000, help="Length of the meta sample")
+    parser.add_argument("--sources", type=int, default=5, help="Genomes mixed in the meta sample")
+    parser.add_argument("--planted", type=int, default=20, help="Database records derived from the meta sample")
+    parser.add_argument("--planted-length", type=int, help="Fixed length of planted records (default: drawn like the others)")
+    parser.add_argument("--mutation-min", type=float, default=0.0, help="Mutation rate of the closest planted record")
+    parser.add_argument("--mutation-max", type=float, default=0.3, help="Mutation rate of the farthest planted record")
+    parser.add_argument("--line-width", type=int, default=70, help="Symbols per line")
+    parser.add_argument("--check", type=str, help="Score a 'score<TAB>name' results file against out-dir/truth.json")
+    parser.add_argument("--min-recall", type=float, help="With --check, fail if fewer planted records (0-1) reach the top")
+    parser.add_argument("--max-inversions", type=int, help="With --check, fail above this many order inversions")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check(os.path.join(args.out_dir, "truth.json"), args.check, args.min_recall, args.max_inversions))
+    else:
+        generate(args)
+
+if __name__ == "__main__":
+    main()
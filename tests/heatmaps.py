@@ -1,33 +1,21 @@
-import json
 import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import os
 
-with open(os.path.abspath(os.path.join(os.path.dirname(__file__), "tests_results.json")), "r") as file:
-    data = json.load(file)
+from results_store import store_for, query_runs
 
-tests = data.get("java", [])
+results_store = store_for(os.path.abspath(os.path.join(os.path.dirname(__file__), "tests_results.json")))
 
 selected_alphas = [1, 0.25, 0.06, 0.015, 0.04, 0.001, 0.00025]
 selected_contexts = [6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
 
-filtered_tests = [
-    test for test in tests
-    if test["alpha"] in selected_alphas and test["contextWidth"] in selected_contexts
-]
-
-alphas = []
-context_widths = []
-mean_scores = []
-std_dev_scores = []
-
-for test in filtered_tests:
-    alphas.append(test["alpha"])
-    context_widths.append(test["contextWidth"])
-    mean_scores.append(test["meanScore"])
-    std_dev_scores.append(test["stdDevScore"])
+rows = query_runs(
+    results_store, ["alpha", "contextWidth", "meanScore", "stdDevScore"],
+    impl="java", alphas=selected_alphas, ks=selected_contexts
+)
+alphas, context_widths, mean_scores, std_dev_scores = (list(column) for column in zip(*rows))
 
 df = pd.DataFrame({
     "Alpha": alphas,
@@ -1,38 +1,32 @@
-import json
 import os
 import matplotlib.pyplot as plt
 import numpy as np
 
+from results_store import store_for, query_results
+
 file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "tests_results.json"))
 
-with open(file_path, "r") as f:
-    data = json.load(f)
+results_store = store_for(file_path)
 
 alpha_target = 1.0
 
-java_tests = data.get("java", [])
-
-filtered = [t for t in java_tests if float(t["alpha"]) == alpha_target]
-filtered.sort(key=lambda x: x["contextWidth"])
+rows = query_results(results_store, "java", alpha_target)
 
-ks = sorted(set(test["contextWidth"] for test in filtered))
+ks = sorted(set(k for k, _, _ in rows))
 
 top_sequences = set()
-for test in filtered:
-    sorted_results = sorted(test["results"], key=lambda x: x["score"])
-    for result in sorted_results[:5]:
-        top_sequences.add(result["name"])
+for k in ks:
+    sorted_results = sorted((score, name) for row_k, score, name in rows if row_k == k)
+    for _, name in sorted_results[:5]:
+        top_sequences.add(name)
 
 top_sequences = sorted(list(top_sequences))  
 
 sequence_scores = {name: {} for name in top_sequences}
 
-for test in filtered:
-    k = test["contextWidth"]
-    for result in test["results"]:
-        name = result["name"]
-        if name in sequence_scores:
-            sequence_scores[name][k] = result["score"] 
+for k, score, name in rows:
+    if name in sequence_scores:
+        sequence_scores[name][k] = score
 
 color_map = plt.colormaps.get_cmap("tab20")
 colors = [color_map(i / len(top_sequences)) for i in range(len(top_sequences))]
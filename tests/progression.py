@@ -0,0 +1,81 @@
+import os
+import sys
+import numpy as np
+import concurrent.futures
+
+# Points kept per plotted line: two (min and max) per horizontal pixel of a 10in x 100dpi figure.
+PLOT_POINTS = 2000
+
+def read_values_from_file(filename):
+    """Reads numerical values from a file, one per line."""
+    try:
+        with open(filename, 'r') as f:
+            return np.array(f.read().split(), dtype=np.float64)
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        sys.exit(1)
+
+def dynamic_window_size(length):
+    """Returns a smooth window size such that:
+    - ~700 -> ~30
+    - ~120000 -> ~20000
+    """
+    return max(1, int(0.0267 * length ** 1.1))
+
+def moving_average(values, window_size):
+    """Simple moving average ('valid' mode) in O(N) whatever the window size, using a cumulative sum."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window_size:
+        return values  # Not enough data to smooth
+    cumsum = np.zeros(len(values) + 1)
+    np.cumsum(values, out=cumsum[1:])
+    return (cumsum[window_size:] - cumsum[:-window_size]) / window_size
+
+def downsample_minmax(values, points=PLOT_POINTS):
+    """Reduces values to about `points` (x, y) pairs keeping the min and max of every bin,
+    so peaks and dips survive at the plot resolution."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= points:
+        return np.arange(len(values)), values
+
+    bins = points // 2
+    size = -(-len(values) // bins)
+    padded = np.full(bins * size, np.nan)
+    padded[:len(values)] = values
+    padded = padded.reshape(bins, size)
+    bins = np.count_nonzero(~np.isnan(padded[:, 0]))
+    padded = padded[:bins]
+
+    starts = np.arange(bins) * size
+    arg_min = np.nanargmin(padded, axis=1)
+    arg_max = np.nanargmax(padded, axis=1)
+    first = np.minimum(arg_min, arg_max)
+    second = np.maximum(arg_min, arg_max)
+
+    x = np.empty(2 * bins, dtype=np.int64)
+    x[0::2] = starts + first
+    x[1::2] = starts + second
+    return x, values[x]
+
+def process_folder(folder_path, plot, workers=None):
+    """Calls plot(values, output_file, sequence_name) for each .txt file directly in the folder,
+    spreading the files across processes."""
+    output_dir = os.path.join(folder_path, "plots")
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    for filename in os.listdir(folder_path):
+        file_path = os.path.join(folder_path, filename)
+        if os.path.isfile(file_path) and filename.endswith(".txt"):
+            sequence_name = os.path.splitext(filename)[0]  # removes ".txt"
+            output_file = os.path.join(output_dir, f"{sequence_name}.png")
+            jobs.append((file_path, output_file, sequence_name))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_process_file, plot, *job): job[1] for job in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+            print(f"Saved plot: {futures[future]}")
+
+def _process_file(plot, file_path, output_file, sequence_name):
+    plot(read_values_from_file(file_path), output_file, sequence_name)
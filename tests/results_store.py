@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import sqlite3
+
+default_json = os.path.abspath(os.path.join(os.path.dirname(__file__), "tests_results.json"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    impl TEXT NOT NULL,
+    alpha REAL NOT NULL,
+    contextWidth INTEGER NOT NULL,
+    top INTEGER,
+    meanScore REAL,
+    stdDevScore REAL,
+    time REAL,
+    memoryMB REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_config ON runs (impl, alpha, contextWidth);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    position INTEGER NOT NULL,
+    score REAL NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+"""
+
+RUN_COLUMNS = ["impl", "alpha", "contextWidth", "top", "meanScore", "stdDevScore", "time", "memoryMB"]
+
+def connect(db_path):
+    """Opens (and creates if needed) a results store."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def has_run(conn, impl, alpha, k):
+    """Index lookup replacing the linear scan over the JSON list."""
+    row = conn.execute(
+        "SELECT 1 FROM runs WHERE impl = ? AND alpha = ? AND contextWidth = ?", (impl, alpha, k)
+    ).fetchone()
+    return row is not None
+
+def append_run(conn, impl, test, commit=True, replace=False):
+    """Stores one run in the tests_results.json record format. Existing configurations are kept
+    unless replace is set."""
+    if replace:
+        conn.execute(
+            "DELETE FROM results WHERE run_id IN (SELECT id FROM runs WHERE impl = ? AND alpha = ? AND contextWidth = ?)",
+            (impl, test["alpha"], test["contextWidth"])
+        )
+        conn.execute(
+            "DELETE FROM runs WHERE impl = ? AND alpha = ? AND contextWidth = ?",
+            (impl, test["alpha"], test["contextWidth"])
+        )
+    cursor = conn.execute(
+        "INSERT OR IGNORE INTO runs (impl, alpha, contextWidth, top, meanScore, stdDevScore, time, memoryMB) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (impl, test["alpha"], test["contextWidth"], test.get("top"), test.get("meanScore"),
+         test.get("stdDevScore"), test.get("time"), test.get("memoryMB"))
+    )
+    if cursor.rowcount:
+        conn.executemany(
+            "INSERT INTO results (run_id, position, score, name) VALUES (?, ?, ?, ?)",
+            [(cursor.lastrowid, i, r["score"], r["name"]) for i, r in enumerate(test.get("results", []))]
+        )
+    if commit:
+        conn.commit()
+
+def import_json(conn, json_path, replace=False):
+    """Imports a tests_results*.json file and records its mtime; returns the number of runs read.
+
+    An unreadable JSON file is treated as empty, like tests_script.py always did, and the
+    import runs in one transaction so the store is never left half updated.
+    """
+    json_path = os.path.abspath(json_path)
+    mtime = os.path.getmtime(json_path)
+    with open(json_path, "r") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Warning: {json_path} is not valid JSON, importing nothing from it")
+            data = {}
+    count = 0
+    with conn:
+        for impl, tests in data.items():
+            for test in tests:
+                append_run(conn, impl, test, commit=False, replace=replace)
+                count += 1
+        conn.execute("INSERT OR REPLACE INTO sources (path, mtime) VALUES (?, ?)", (json_path, mtime))
+    return count
+
+def store_for(json_path=default_json):
+    """Returns the store next to a results JSON file, importing the JSON whenever it changed
+    since the last import; runs from a changed file replace the stored ones."""
+    json_path = os.path.abspath(json_path)
+    db_path = os.path.splitext(json_path)[0] + ".db"
+    conn = connect(db_path)
+    if os.path.exists(json_path):
+        row = conn.execute("SELECT mtime FROM sources WHERE path = ?", (json_path,)).fetchone()
+        if row is None or row[0] != os.path.getmtime(json_path):
+            import_json(conn, json_path, replace=row is not None)
+    return conn
+
+def query_runs(conn, columns, impl=None, alphas=None, ks=None):
+    """Returns only the requested run columns, optionally filtered by configuration."""
+    for column in columns:
+        if column not in RUN_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+    sql = f"SELECT {', '.join(columns)} FROM runs WHERE 1 = 1"
+    params = []
+    if impl is not None:
+        sql += " AND impl = ?"
+        params.append(impl)
+    if alphas is not None:
+        sql += f" AND alpha IN ({', '.join('?' * len(alphas))})"
+        params.extend(alphas)
+    if ks is not None:
+        sql += f" AND contextWidth IN ({', '.join('?' * len(ks))})"
+        params.extend(ks)
+    return conn.execute(sql, params).fetchall()
+
+def query_results(conn, impl, alpha):
+    """Returns (contextWidth, score, name) for every ranked sequence of one impl and alpha."""
+    return conn.execute(
+        "SELECT runs.contextWidth, results.score, results.name FROM results "
+        "JOIN runs ON runs.id = results.run_id WHERE runs.impl = ? AND runs.alpha = ? "
+        "ORDER BY runs.contextWidth, results.position",
+        (impl, alpha)
+    ).fetchall()
+
+def main():
+    """Usage: python results_store.py tests_results.json [tests_results_java.json ...]"""
+    paths = sys.argv[1:] or [default_json]
+    for path in paths:
+        path = os.path.abspath(path)
+        db_path = os.path.splitext(path)[0] + ".db"
+        conn = connect(db_path)
+        count = import_json(conn, path, replace=True)
+        conn.close()
+        print(f"Imported {count} runs from {path} into {db_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 import os
 import sys
-import json
 import subprocess
 import statistics
 import time
 import psutil
 
+from results_store import store_for, has_run, append_run
+
 impl = sys.argv[1] if len(sys.argv) > 1 else "java"
 
 c_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../c/meta"))
@@ -22,17 +23,7 @@ alpha_values = [1, 0.25, 0.06, 0.015, 0.04, 0.001, 0.00025, 0.00006, 0.00001, 0.
 k_values = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
 t_value = 20
 
-if os.path.exists(output_file):
-    with open(output_file, "r") as f:
-        try:
-            results_data = json.load(f)
-        except json.JSONDecodeError:
-            results_data = {}
-else:
-    results_data = {}
-
-if impl not in results_data:
-    results_data[impl] = []
+results_store = store_for(output_file)
 
 def run_test(alpha, k):
     if impl == "java":
@@ -146,12 +137,12 @@ def run_test(alpha, k):
 
 for alpha in alpha_values:
     for k in k_values:
-        test_exists = any(test["alpha"] == alpha and test["contextWidth"] == k for test in results_data[impl])
+        test_exists = has_run(results_store, impl, alpha, k)
         
         if not test_exists:
             results, mean_score, std_dev_score, elapsed_time, peak_memory = run_test(alpha, k) or (None, None, None, None, None)
             if results:
-                results_data[impl].append({
+                append_run(results_store, impl, {
                     "alpha": alpha,
                     "contextWidth": k,
                     "top": t_value,
@@ -162,7 +153,6 @@ for alpha in alpha_values:
                     "results": results
                 })
 
-with open(output_file, "w") as f:
-    json.dump(results_data, f, indent=4)
+results_store.close()
 
 print("Test execution completed and results saved!")
\ No newline at end of file